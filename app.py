@@ -1,182 +1,544 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash, send_file
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash, send_file, make_response
+from flask.json.provider import DefaultJSONProvider
+from flask_compress import Compress
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+import orjson
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, NamedTupleCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.middleware.proxy_fix import ProxyFix
 from datetime import datetime, date, timedelta
-import pytz
+from zoneinfo import ZoneInfo
 import os
+import atexit
+import click
+import logging
+import logging.handlers
+import queue
+import re
+import threading
+import weakref
+from contextlib import contextmanager
+from collections import Counter
+from functools import lru_cache, wraps
+from operator import itemgetter
 from dotenv import load_dotenv
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, LongTable, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib import colors
 from reportlab.lib.units import inch
 import io
+import csv
+import tempfile
+from cachetools import TTLCache
+import hashlib
 
 # Load environment variables
 load_dotenv()
 
+# Logging goes through a queue so request threads never block on stdout;
+# the listener thread does the actual writing
+log_queue = queue.Queue(-1)
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter('%(message)s'))
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+log_listener = logging.handlers.QueueListener(log_queue, stream_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson for faster jsonify() responses"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NAIVE_UTC).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'fallback-secret-key')
 
+# Compress text responses (Brotli when the client supports it, else gzip).
+# PDFs are already compressed and are left out on purpose.
+app.config['COMPRESS_MIMETYPES'] = ['text/html', 'text/css', 'application/javascript', 'application/json']
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 1024
+Compress(app)
+
+# Trust the X-Forwarded-For header set by the hosting proxy so rate limits
+# are keyed on the real client address
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1)
+
+# Rate limiting (set RATELIMIT_STORAGE_URI to a Redis URL to share limits across workers)
+app.config['RATELIMIT_STORAGE_URI'] = os.getenv('RATELIMIT_STORAGE_URI', 'memory://')
+limiter = Limiter(get_remote_address, app=app)
+
+# Static files are served with a version query string (the file's mtime),
+# so browsers can cache them for a year and still pick up new deploys
+STATIC_MAX_AGE = 31536000
+
+@lru_cache(maxsize=None)
+def static_file_version(filename):
+    try:
+        return int(os.path.getmtime(os.path.join(app.static_folder, filename)))
+    except OSError:
+        return None
+
+# Newest mtime of the code, templates and static files. A deploy checks out
+# fresh files, so this changes with every release.
+@lru_cache(maxsize=None)
+def code_version():
+    paths = [__file__] + [
+        os.path.join(root, name)
+        for folder in (app.template_folder, app.static_folder)
+        for root, _, names in os.walk(os.path.join(app.root_path, folder))
+        for name in names
+    ]
+    return max(int(os.path.getmtime(path)) for path in paths)
+
+@app.url_defaults
+def add_static_version(endpoint, values):
+    if endpoint == 'static' and 'filename' in values:
+        # The debug reloader does not restart on CSS edits, so skip the cache there
+        version = static_file_version.__wrapped__ if app.debug else static_file_version
+        values.setdefault('v', version(values['filename']))
+
+@app.after_request
+def add_static_cache_headers(response):
+    if request.endpoint == 'static' and request.args.get('v'):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
 # South Africa timezone
-sa_timezone = pytz.timezone('Africa/Johannesburg')
+sa_timezone = ZoneInfo('Africa/Johannesburg')
 
 # Database configuration
-def get_db_connection():
+def get_database_url():
     database_url = os.environ.get('DATABASE_URL')
     
     if database_url and database_url.startswith("postgres://"):
         database_url = database_url.replace("postgres://", "postgresql://", 1)
     
-    try:
-        conn = psycopg2.connect(database_url)
+    return database_url
+
+# Hot-path statements prepared once on every pooled connection, so each
+# request skips Postgres' parse and plan step and just runs EXECUTE
+PREPARED_STATEMENTS = {
+    # Check the student exists, take the next number from today's counter
+    # (SA date computed by Postgres) and insert the complaint with it, all in
+    # a single round-trip. No row is returned for an unknown student.
+    'submit_complaint': '''
+        WITH counter AS (
+            INSERT INTO daily_counter (day, n)
+            SELECT (now() AT TIME ZONE 'Africa/Johannesburg')::date, 1
+            WHERE EXISTS (SELECT 1 FROM students WHERE student_number = $2)
+            ON CONFLICT (day) DO UPDATE SET n = daily_counter.n + 1
+            RETURNING n
+        )
+        INSERT INTO complaints
+        (complaint_number, name_surname, student_number, student_email, block_number, unit_number, room_number, complaint_text)
+        SELECT counter.n, $1, $2, $3, $4, $5, $6, $7 FROM counter
+        RETURNING complaint_number
+    ''',
+}
+
+# SQL-level PREPARE only lasts for a server session, so it must be switched
+# off (DB_PREPARED_STATEMENTS=false) behind pgbouncer in transaction mode
+USE_PREPARED_STATEMENTS = os.getenv('DB_PREPARED_STATEMENTS', 'true').lower() == 'true'
+
+# The same statements with psycopg2 named placeholders ($2 -> %(p2)s), for running them inline
+INLINE_STATEMENTS = {name: re.sub(r'\$(\d+)', r'%(p\1)s', sql) for name, sql in PREPARED_STATEMENTS.items()}
+
+def execute_statement(cur, name, params):
+    """Run one of PREPARED_STATEMENTS, inline when prepared statements are disabled"""
+    if USE_PREPARED_STATEMENTS:
+        cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+    else:
+        cur.execute(INLINE_STATEMENTS[name], {f'p{i}': value for i, value in enumerate(params, 1)})
+
+class PreparedConnectionPool(ThreadedConnectionPool):
+    """Thread-safe pool that prepares PREPARED_STATEMENTS on each connection"""
+    
+    def __init__(self, *args, **kwargs):
+        # Tracked by object, not id(): the pool closes surplus connections and
+        # a new one may reuse a dead one's id without having been prepared
+        self._prepared = weakref.WeakSet()
+        super().__init__(*args, **kwargs)
+    
+    def getconn(self, key=None):
+        conn = super().getconn(key)
+        if conn not in self._prepared:
+            try:
+                self._prepare(conn)
+            except Exception:
+                # Dead connection: hand the slot back instead of leaking it
+                super().putconn(conn, close=True)
+                raise
         return conn
-    except Exception as e:
-        print(f"Database connection error: {e}")
-        return None
+    
+    def _prepare(self, conn):
+        try:
+            with conn.cursor() as cur:
+                cur.execute("DEALLOCATE ALL")
+                for name, sql in PREPARED_STATEMENTS.items():
+                    cur.execute(f"PREPARE {name} AS {sql}")
+            conn.commit()
+            self._prepared.add(conn)
+        except psycopg2.Error as e:
+            # Tables may not exist yet (before init_db); retried on next checkout
+            app.logger.warning(f"Error preparing statements: {e}")
+            conn.rollback()
+
+# Connection pool shared by all request threads, created on first use.
+# psycopg2 closes returned connections beyond minconn, so keep one idle
+# connection per gunicorn thread to avoid reconnecting under load.
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', 20))
+DB_POOL_MIN = min(int(os.getenv('DB_POOL_MIN', os.getenv('GUNICORN_THREADS', 8))), DB_POOL_MAX)
+DB_POOL = None
+_db_pool_lock = threading.Lock()
+
+def get_db_pool():
+    global DB_POOL
+    if DB_POOL is None:
+        with _db_pool_lock:
+            if DB_POOL is None:
+                pool_class = PreparedConnectionPool if USE_PREPARED_STATEMENTS else ThreadedConnectionPool
+                DB_POOL = pool_class(DB_POOL_MIN, DB_POOL_MAX, get_database_url())
+                atexit.register(DB_POOL.closeall)
+    return DB_POOL
+
+def get_live_connection(pool):
+    """Check out a pooled connection that still answers, dropping dead ones"""
+    # After a server restart or failover every idle connection is dead. At most
+    # DB_POOL_MIN sit idle, so the last attempt gets a freshly opened one.
+    for attempt in range(DB_POOL_MIN + 1):
+        conn = pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            return conn
+        except psycopg2.OperationalError:
+            pool.putconn(conn, close=True)
+            if attempt == DB_POOL_MIN:
+                raise
+
+@contextmanager
+def db_cursor(cursor_factory=None, name=None):
+    """Borrow a pooled connection, commit on success and roll back on error"""
+    # A name opens a server-side cursor, which fetches cur.itersize rows at a time
+    pool = get_db_pool()
+    conn = get_live_connection(pool)
+    try:
+        cur = conn.cursor(name, cursor_factory=cursor_factory)
+        try:
+            yield cur
+        finally:
+            cur.close()
+        conn.commit()
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn, close=bool(conn.closed))
+
+@contextmanager
+def direct_cursor():
+    """Cursor on a dedicated unpooled connection, for one-off commands like init-db"""
+    conn = psycopg2.connect(get_database_url())
+    try:
+        with conn, conn.cursor() as cur:
+            yield cur
+    finally:
+        conn.close()
+
+# Admin list pagination
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def get_page_args():
+    """Read the keyset cursor ((created_at, id) of the last row shown) and page size"""
+    # created_at alone is not unique (a bulk import shares one timestamp),
+    # so the cursor carries the row id as a tie-breaker: "<iso>_<id>"
+    cursor = request.args.get('cursor')
+    try:
+        created_at, _, row_id = cursor.rpartition('_')
+        cursor = (datetime.fromisoformat(created_at), int(row_id))
+    except (AttributeError, ValueError):
+        cursor = None
+    
+    limit = request.args.get('limit', PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return cursor, limit
+
+def split_page(rows, limit):
+    """Trim the look-ahead row and return (page, next_cursor)"""
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        return rows[:limit], f"{last.created_at.isoformat()}_{last.id}"
+    return rows, None
+
+# Rendered-list data for the students page, keyed by its ETag. The ETag
+# includes the table's MAX(created_at) and COUNT(*), so a change made on
+# another worker produces a new key instead of serving a stale page.
+STUDENTS_CACHE = TTLCache(maxsize=64, ttl=60)
+_students_cache_lock = threading.Lock()
+
+def clear_students_cache():
+    with _students_cache_lock:
+        STUDENTS_CACHE.clear()
+
+def list_etag(*parts):
+    """ETag for an admin list page: data and code version plus the query string and user"""
+    # Templates and stylesheets can change with a deploy while the data does not
+    version = code_version.__wrapped__() if app.debug else code_version()
+    key = '|'.join(map(str, (*parts, version, request.full_path, session.get('admin_username'))))
+    return hashlib.md5(key.encode()).hexdigest()
+
+def client_has_etag(etag):
+    """True when If-None-Match names etag, also in Flask-Compress' ':br'/':gzip' form"""
+    if '_flashes' in session:
+        return False
+    return any(request.if_none_match.contains(tag) for tag in (etag, f"{etag}:br", f"{etag}:gzip"))
+
+def conditional_response(body, etag):
+    response = make_response(body)
+    if etag:
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+    return response
 
 def init_db():
     """Initialize database tables"""
-    conn = get_db_connection()
-    if conn is None:
-        print("Failed to connect to database")
-        return
-    
-    cur = conn.cursor()
-    
+    # Not the request pool: its connections prepare statements against
+    # tables this creates, and it would open DB_POOL_MIN connections
     try:
-        # Create students table
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS students (
-                id SERIAL PRIMARY KEY,
-                student_number VARCHAR(20) UNIQUE NOT NULL,
-                name_surname VARCHAR(100) NOT NULL,
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Create complaints table
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS complaints (
-                id SERIAL PRIMARY KEY,
-                complaint_number INTEGER NOT NULL,
-                name_surname VARCHAR(100) NOT NULL,
-                student_number VARCHAR(20) NOT NULL,
-                student_email VARCHAR(100) NOT NULL,
-                block_number VARCHAR(10) NOT NULL,
-                unit_number VARCHAR(10) NOT NULL,
-                room_number VARCHAR(10) NOT NULL,
-                complaint_text TEXT NOT NULL,
-                status VARCHAR(20) DEFAULT 'pending',
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP WITH TIME ZONE
-            )
-        ''')
-        
-        # Create admin table
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS admin (
-                id SERIAL PRIMARY KEY,
-                username VARCHAR(50) UNIQUE NOT NULL,
-                password_hash VARCHAR(255) NOT NULL,
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Check if admin exists, if not create default admin
-        cur.execute("SELECT COUNT(*) FROM admin WHERE username = %s", (os.getenv('ADMIN_USERNAME'),))
-        if cur.fetchone()[0] == 0:
-            password_hash = generate_password_hash(os.getenv('ADMIN_PASSWORD'))
+        with direct_cursor() as cur:
+            # Create students table
+            cur.execute('''
+                CREATE TABLE IF NOT EXISTS students (
+                    id SERIAL PRIMARY KEY,
+                    student_number VARCHAR(20) UNIQUE NOT NULL,
+                    name_surname VARCHAR(100) NOT NULL,
+                    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Create complaints table
+            cur.execute('''
+                CREATE TABLE IF NOT EXISTS complaints (
+                    id SERIAL PRIMARY KEY,
+                    complaint_number INTEGER NOT NULL,
+                    name_surname VARCHAR(100) NOT NULL,
+                    student_number VARCHAR(20) NOT NULL,
+                    student_email VARCHAR(100) NOT NULL,
+                    block_number VARCHAR(10) NOT NULL,
+                    unit_number VARCHAR(10) NOT NULL,
+                    room_number VARCHAR(10) NOT NULL,
+                    complaint_text TEXT NOT NULL,
+                    status VARCHAR(20) DEFAULT 'pending',
+                    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                    completed_at TIMESTAMP WITH TIME ZONE,
+                    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Last-change marker used for the dashboard ETag (older databases).
+            # Checked first: ALTER TABLE locks complaints even when it is a no-op.
             cur.execute(
-                "INSERT INTO admin (username, password_hash) VALUES (%s, %s)",
-                (os.getenv('ADMIN_USERNAME'), password_hash)
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = 'complaints' AND column_name = 'updated_at'"
             )
+            if cur.fetchone() is None:
+                cur.execute("ALTER TABLE complaints ADD COLUMN updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_complaints_updated_at ON complaints (updated_at)")
+            
+            # Index the South African calendar date of each complaint so the
+            # daily numbering, date search and report queries avoid a full scan.
+            # The expression must match the WHERE clauses exactly to be used.
+            cur.execute('''
+                CREATE INDEX IF NOT EXISTS idx_complaints_sa_date
+                ON complaints (((created_at AT TIME ZONE 'Africa/Johannesburg')::date))
+            ''')
+            cur.execute('''
+                CREATE INDEX IF NOT EXISTS idx_complaints_student_number
+                ON complaints (student_number)
+            ''')
+            
+            # Newest-first listing and keyset pagination ((created_at, id) < cursor)
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_complaints_created_at_id ON complaints (created_at DESC, id DESC)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_students_created_at_id ON students (created_at DESC, id DESC)")
+            
+            # Per-day counter used to hand out complaint numbers atomically
+            cur.execute('''
+                CREATE TABLE IF NOT EXISTS daily_counter (
+                    day DATE PRIMARY KEY,
+                    n INTEGER NOT NULL
+                )
+            ''')
+            
+            # Seed counters for days that already have complaints
+            cur.execute('''
+                INSERT INTO daily_counter (day, n)
+                SELECT (created_at AT TIME ZONE 'Africa/Johannesburg')::date, MAX(complaint_number)
+                FROM complaints
+                GROUP BY 1
+                ON CONFLICT (day) DO NOTHING
+            ''')
+            
+            # Create admin table
+            cur.execute('''
+                CREATE TABLE IF NOT EXISTS admin (
+                    id SERIAL PRIMARY KEY,
+                    username VARCHAR(50) UNIQUE NOT NULL,
+                    password_hash VARCHAR(255) NOT NULL,
+                    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Check if admin exists, if not create default admin
+            cur.execute("SELECT COUNT(*) FROM admin WHERE username = %s", (os.getenv('ADMIN_USERNAME'),))
+            if cur.fetchone()[0] == 0:
+                password_hash = generate_password_hash(os.getenv('ADMIN_PASSWORD'))
+                cur.execute(
+                    "INSERT INTO admin (username, password_hash) VALUES (%s, %s)",
+                    (os.getenv('ADMIN_USERNAME'), password_hash)
+                )
         
-        conn.commit()
-        print("Database initialized successfully")
+        app.logger.info("Database initialized successfully")
         
+    except Exception:
+        app.logger.exception("Database initialization error")
+        raise
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Create tables, indexes and the default admin (run once per deploy)"""
+    # Exit non-zero so the deploy stops instead of starting without a schema
+    try:
+        init_db()
     except Exception as e:
-        print(f"Database initialization error: {e}")
-        conn.rollback()
-    finally:
-        cur.close()
-        conn.close()
+        raise click.ClickException(f"Database initialization failed: {e}")
 
-# Initialize database when app starts
-with app.app_context():
-    init_db()
+# PDF report layout, built once and shared by every report
+PDF_STYLES = getSampleStyleSheet()
+PDF_HEADER_ROW = ['Comp #', 'Date', 'Student #', 'Name', 'Location', 'Complaint', 'Status']
+PDF_ROW_FIELDS = itemgetter(
+    'complaint_number', 'created_at', 'student_number', 'name_surname',
+    'block_number', 'unit_number', 'room_number', 'complaint_text', 'status'
+)
+PDF_COL_WIDTHS = [0.5*inch, 1*inch, 1*inch, 1.2*inch, 1.5*inch, 2*inch, 0.8*inch]
+PDF_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+# Report table rows, built in a single pass so complaints can be a streaming cursor
+def complaints_pdf_rows(complaints):
+    return [
+        [
+            str(complaint_number),
+            created_at.strftime('%Y-%m-%d %H:%M'),
+            student_number,
+            name_surname,
+            f"Block {block_number}, Unit {unit_number}, Room {room_number}",
+            # Truncate complaint text if too long
+            complaint_text if len(complaint_text) <= 100 else complaint_text[:100] + '...',
+            status.upper()
+        ]
+        for (complaint_number, created_at, student_number, name_surname,
+             block_number, unit_number, room_number, complaint_text, status) in map(PDF_ROW_FIELDS, complaints)
+    ]
 
 # Helper function to generate PDF
-def generate_complaints_pdf(complaints, period):
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
+def generate_complaints_pdf(rows, period, target):
+    doc = SimpleDocTemplate(target, pagesize=letter)
     elements = []
     
-    styles = getSampleStyleSheet()
-    
     # Title
-    title = Paragraph(f"Maintenance Complaints Report - {period}", styles['Title'])
+    title = Paragraph(f"Maintenance Complaints Report - {period}", PDF_STYLES['Title'])
     elements.append(title)
     elements.append(Spacer(1, 0.3*inch))
     
+    table_data = [PDF_HEADER_ROW, *rows]
+    
     # Summary
-    total_complaints = len(complaints)
-    pending_count = len([c for c in complaints if c['status'] == 'pending'])
-    completed_count = len([c for c in complaints if c['status'] == 'completed'])
+    status_counts = Counter(row[-1] for row in rows)
+    total_complaints = len(rows)
+    pending_count = status_counts['PENDING']
+    completed_count = status_counts['COMPLETED']
     
     summary_text = f"Total Complaints: {total_complaints} | Pending: {pending_count} | Completed: {completed_count}"
-    summary = Paragraph(summary_text, styles['Normal'])
+    summary = Paragraph(summary_text, PDF_STYLES['Normal'])
     elements.append(summary)
     elements.append(Spacer(1, 0.2*inch))
     
-    # Table data
-    table_data = [['Comp #', 'Date', 'Student #', 'Name', 'Location', 'Complaint', 'Status']]
-    
-    for complaint in complaints:
-        location = f"Block {complaint['block_number']}, Unit {complaint['unit_number']}, Room {complaint['room_number']}"
-        complaint_date = complaint['created_at'].strftime('%Y-%m-%d %H:%M')
-        
-        # Truncate complaint text if too long
-        complaint_text = complaint['complaint_text']
-        if len(complaint_text) > 100:
-            complaint_text = complaint_text[:100] + '...'
-        
-        table_data.append([
-            str(complaint['complaint_number']),
-            complaint_date,
-            complaint['student_number'],
-            complaint['name_surname'],
-            location,
-            complaint_text,
-            complaint['status'].upper()
-        ])
-    
-    # Create table
-    table = Table(table_data, colWidths=[0.5*inch, 1*inch, 1*inch, 1.2*inch, 1.5*inch, 2*inch, 0.8*inch])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    # Create table (LongTable lays out large multi-page tables faster than Table)
+    table = LongTable(table_data, colWidths=PDF_COL_WIDTHS)
+    table.setStyle(PDF_TABLE_STYLE)
     
     elements.append(table)
     
     # Footer
     elements.append(Spacer(1, 0.3*inch))
     generated_date = datetime.now(sa_timezone).strftime('%Y-%m-%d %H:%M')
-    footer = Paragraph(f"Generated on: {generated_date}", styles['Normal'])
+    footer = Paragraph(f"Generated on: {generated_date}", PDF_STYLES['Normal'])
     elements.append(footer)
     
     doc.build(elements)
-    buffer.seek(0)
-    return buffer
+
+# Admin username -> password hash, loaded once per process on first login.
+# There is no route that changes admin accounts; restart to pick up changes.
+ADMIN_CREDENTIALS = None
+_admin_credentials_lock = threading.Lock()
+
+def get_admin_credentials():
+    global ADMIN_CREDENTIALS
+    if ADMIN_CREDENTIALS is None:
+        with _admin_credentials_lock:
+            if ADMIN_CREDENTIALS is None:
+                with db_cursor() as cur:
+                    cur.execute("SELECT username, password_hash FROM admin")
+                    credentials = dict(cur.fetchall())
+                # Not cached while empty, so logins work once init-db has run
+                if credentials:
+                    ADMIN_CREDENTIALS = credentials
+                return credentials
+    return ADMIN_CREDENTIALS
+
+# Admin access checks, applied before a view can touch the database
+def admin_required(view):
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if not session.get('admin_logged_in'):
+            return redirect(url_for('admin_login'))
+        return view(*args, **kwargs)
+    return wrapped
+
+def admin_required_json(view):
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if not session.get('admin_logged_in'):
+            return jsonify({'success': False, 'message': 'Not authorized'}), 401
+        return view(*args, **kwargs)
+    return wrapped
 
 # Routes
 @app.route('/')
@@ -199,46 +561,21 @@ def submit_complaint():
         room_number = request.form.get('room_number')
         complaint_text = request.form.get('complaint_text')
 
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({
-                'success': False,
-                'message': 'Database connection error. Please try again.'
-            }), 500
-
-        cur = conn.cursor()
-
-        # Check if student exists
-        cur.execute("SELECT * FROM students WHERE student_number = %s", (student_number,))
-        student = cur.fetchone()
+        with db_cursor() as cur:
+            # Create new complaint numbered from today's counter (row lock prevents duplicates)
+            execute_statement(
+                cur, 'submit_complaint',
+                (name_surname, student_number, student_email, block_number, unit_number, room_number, complaint_text)
+            )
+            result = cur.fetchone()
         
-        if not student:
-            cur.close()
-            conn.close()
+        # Nothing is inserted when the student does not exist
+        if result is None:
             return jsonify({
                 'success': False,
                 'message': 'Invalid student number.'
             }), 400
-
-        # Get today's complaint count for numbering
-        today = datetime.now(sa_timezone).date()
-        cur.execute(
-            "SELECT COUNT(*) FROM complaints WHERE DATE(created_at AT TIME ZONE 'UTC' AT TIME ZONE 'Africa/Johannesburg') = %s",
-            (today,)
-        )
-        today_complaints_count = cur.fetchone()[0]
-        complaint_number = today_complaints_count + 1
-
-        # Create new complaint
-        cur.execute('''
-            INSERT INTO complaints 
-            (complaint_number, name_surname, student_number, student_email, block_number, unit_number, room_number, complaint_text)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        ''', (complaint_number, name_surname, student_number, student_email, block_number, unit_number, room_number, complaint_text))
-
-        conn.commit()
-        cur.close()
-        conn.close()
+        complaint_number = result[0]
 
         return jsonify({
             'success': True,
@@ -246,36 +583,28 @@ def submit_complaint():
             'complaint_number': complaint_number
         })
 
-    except Exception as e:
-        if 'conn' in locals():
-            conn.rollback()
-            if 'cur' in locals():
-                cur.close()
-            conn.close()
+    except Exception:
+        app.logger.exception("Error submitting complaint")
         return jsonify({
             'success': False,
             'message': 'An error occurred while submitting your complaint. Please try again.'
         }), 500
 
 @app.route('/admin/login', methods=['GET', 'POST'])
+@limiter.limit("5/minute", methods=['POST'])
 def admin_login():
     if request.method == 'POST':
         username = request.form.get('username')
         password = request.form.get('password')
         
-        conn = get_db_connection()
-        if conn is None:
+        try:
+            password_hash = get_admin_credentials().get(username)
+        except psycopg2.Error:
+            app.logger.exception("Error looking up admin")
             flash('Database connection error', 'error')
             return render_template('admin_login.html')
         
-        cur = conn.cursor()
-        
-        cur.execute("SELECT * FROM admin WHERE username = %s", (username,))
-        admin_user = cur.fetchone()
-        cur.close()
-        conn.close()
-        
-        if admin_user and check_password_hash(admin_user[2], password):
+        if password_hash and check_password_hash(password_hash, password):
             session['admin_logged_in'] = True
             session['admin_username'] = username
             return redirect(url_for('admin_dashboard'))
@@ -285,287 +614,328 @@ def admin_login():
     return render_template('admin_login.html')
 
 @app.route('/admin/dashboard')
+@admin_required
 def admin_dashboard():
-    if not session.get('admin_logged_in'):
-        return redirect(url_for('admin_login'))
-    
-    conn = get_db_connection()
-    if conn is None:
-        flash('Database connection error', 'error')
-        return render_template('admin_dashboard.html', complaints=[])
-    
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    
     # Get search parameters
     search_date = request.args.get('search_date')
-    
+    cursor, limit = get_page_args()
+    
+    conditions = []
+    params = []
+    if search_date:
+        try:
+            search_date_obj = datetime.strptime(search_date, '%Y-%m-%d').date()
+            conditions.append("(created_at AT TIME ZONE 'Africa/Johannesburg')::date = %s")
+            params.append(search_date_obj)
+        except ValueError:
+            pass
+    # Status totals cover the whole filter, not just the current page
+    count_where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    count_params = list(params)
+    if cursor:
+        conditions.append("(created_at, id) < (%s, %s)")
+        params.extend(cursor)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    
+    etag = None
     try:
-        if search_date:
-            try:
-                search_date_obj = datetime.strptime(search_date, '%Y-%m-%d').date()
-                cur.execute(
-                    "SELECT * FROM complaints WHERE DATE(created_at AT TIME ZONE 'UTC' AT TIME ZONE 'Africa/Johannesburg') = %s ORDER BY created_at DESC",
-                    (search_date_obj,)
-                )
-            except ValueError:
-                cur.execute("SELECT * FROM complaints ORDER BY created_at DESC")
-        else:
-            cur.execute("SELECT * FROM complaints ORDER BY created_at DESC")
-        
-        complaints = cur.fetchall()
-    except Exception as e:
-        print(f"Error fetching complaints: {e}")
-        complaints = []
-    finally:
-        cur.close()
-        conn.close()
+        with db_cursor(NamedTupleCursor) as cur:
+            # Change marker: MAX reads the end of idx_complaints_updated_at, and
+            # COUNT(*) catches inserts committed with an older updated_at
+            cur.execute("SELECT MAX(updated_at), COUNT(*) FROM complaints")
+            etag = list_etag(*cur.fetchone())
+            if client_has_etag(etag):
+                return conditional_response(('', 304), etag)
+            
+            cur.execute(f"SELECT status, COUNT(*) FROM complaints {count_where} GROUP BY status", count_params)
+            counts = dict(cur.fetchall())
+            
+            # Fetch one extra row to know whether an older page exists
+            cur.execute(
+                "SELECT id, complaint_number, name_surname, student_number, student_email, block_number, unit_number, room_number, complaint_text, status, created_at "
+                f"FROM complaints {where} ORDER BY created_at DESC, id DESC LIMIT %s",
+                (*params, limit + 1)
+            )
+            complaints, next_cursor = split_page(cur.fetchall(), limit)
+    except Exception:
+        app.logger.exception("Error fetching complaints")
+        flash('Database connection error', 'error')
+        complaints, next_cursor, counts, etag = [], None, {}, None
     
-    return render_template('admin_dashboard.html', complaints=complaints)
+    return conditional_response(
+        render_template('admin_dashboard.html', complaints=complaints, next_cursor=next_cursor, counts=counts),
+        etag
+    )
 
 @app.route('/admin/students')
+@admin_required
 def admin_students():
-    if not session.get('admin_logged_in'):
-        return redirect(url_for('admin_login'))
+    cursor, limit = get_page_args()
     
-    conn = get_db_connection()
-    if conn is None:
+    etag = None
+    try:
+        with db_cursor(NamedTupleCursor) as cur:
+            cur.execute("SELECT MAX(created_at), COUNT(*) FROM students")
+            etag = list_etag(*cur.fetchone())
+            if client_has_etag(etag):
+                return conditional_response(('', 304), etag)
+            
+            with _students_cache_lock:
+                page = STUDENTS_CACHE.get(etag)
+            if page is None:
+                if cursor:
+                    cur.execute(
+                        "SELECT id, student_number, name_surname, created_at FROM students WHERE (created_at, id) < (%s, %s) ORDER BY created_at DESC, id DESC LIMIT %s",
+                        (*cursor, limit + 1)
+                    )
+                else:
+                    cur.execute("SELECT id, student_number, name_surname, created_at FROM students ORDER BY created_at DESC, id DESC LIMIT %s", (limit + 1,))
+                page = split_page(cur.fetchall(), limit)
+                with _students_cache_lock:
+                    STUDENTS_CACHE[etag] = page
+            students, next_cursor = page
+    except Exception:
+        app.logger.exception("Error fetching students")
         flash('Database connection error', 'error')
-        return render_template('admin_students.html', students=[])
-    
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+        students, next_cursor, etag = [], None, None
     
-    try:
-        cur.execute("SELECT * FROM students ORDER BY created_at DESC")
-        students = cur.fetchall()
-    except Exception as e:
-        print(f"Error fetching students: {e}")
-        students = []
-    finally:
-        cur.close()
-        conn.close()
+    return conditional_response(
+        render_template('admin_students.html', students=students, next_cursor=next_cursor),
+        etag
+    )
+
+# Date range and title for a report period, memoized per (period, day)
+@lru_cache(maxsize=64)
+def period_range(period, today):
+    if period == 'today':
+        start_date = today
+        end_date = today
+        period_text = f"Today ({today})"
+    elif period == 'week':
+        start_date = today - timedelta(days=7)
+        end_date = today
+        period_text = f"Last Week ({start_date} to {today})"
+    elif period == 'month':
+        start_date = today.replace(day=1)
+        end_date = today
+        period_text = f"This Month ({start_date} to {today})"
+    elif period == 'all':
+        start_date = None
+        end_date = None
+        period_text = "All Time"
+    else:
+        # Custom month range (format: YYYY-MM)
+        try:
+            year, month = map(int, period.split('-'))
+            start_date = date(year, month, 1)
+            if month == 12:
+                end_date = date(year + 1, 1, 1) - timedelta(days=1)
+            else:
+                end_date = date(year, month + 1, 1) - timedelta(days=1)
+            period_text = f"Month {period}"
+        except:
+            start_date = today
+            end_date = today
+            period_text = f"Today ({today})"
     
-    return render_template('admin_students.html', students=students)
+    return start_date, end_date, period_text
 
 @app.route('/admin/download-complaints/<period>')
+@admin_required
 def download_complaints(period):
-    if not session.get('admin_logged_in'):
-        return redirect(url_for('admin_login'))
-    
-    conn = get_db_connection()
-    if conn is None:
-        flash('Database connection error', 'error')
-        return redirect(url_for('admin_dashboard'))
-    
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    
     try:
         today = datetime.now(sa_timezone).date()
         
-        if period == 'today':
-            start_date = today
-            end_date = today
-            period_text = f"Today ({today})"
-        elif period == 'week':
-            start_date = today - timedelta(days=7)
-            end_date = today
-            period_text = f"Last Week ({start_date} to {today})"
-        elif period == 'month':
-            start_date = today.replace(day=1)
-            end_date = today
-            period_text = f"This Month ({start_date} to {today})"
-        elif period == 'all':
-            start_date = None
-            end_date = None
-            period_text = "All Time"
-        else:
-            # Custom month range (format: YYYY-MM)
-            try:
-                year, month = map(int, period.split('-'))
-                start_date = date(year, month, 1)
-                if month == 12:
-                    end_date = date(year + 1, 1, 1) - timedelta(days=1)
-                else:
-                    end_date = date(year, month + 1, 1) - timedelta(days=1)
-                period_text = f"Month {period}"
-            except:
-                start_date = today
-                end_date = today
-                period_text = f"Today ({today})"
-        
-        if start_date and end_date:
-            cur.execute(
-                "SELECT * FROM complaints WHERE DATE(created_at AT TIME ZONE 'UTC' AT TIME ZONE 'Africa/Johannesburg') BETWEEN %s AND %s ORDER BY created_at DESC",
-                (start_date, end_date)
-            )
-        else:
-            cur.execute("SELECT * FROM complaints ORDER BY created_at DESC")
-        
-        complaints = cur.fetchall()
+        start_date, end_date, period_text = period_range(period, today)
         
-        # Generate PDF
-        pdf_buffer = generate_complaints_pdf(complaints, period_text)
+        # Only the columns used by the PDF report
+        columns = "complaint_number, created_at, student_number, name_surname, block_number, unit_number, room_number, complaint_text, status"
         
+        # Stream rows from a server-side cursor into the report's table rows
+        with db_cursor(RealDictCursor, name='complaints_export') as cur:
+            cur.itersize = 2000
+            if start_date and end_date:
+                cur.execute(
+                    f"SELECT {columns} FROM complaints WHERE (created_at AT TIME ZONE 'Africa/Johannesburg')::date BETWEEN %s AND %s ORDER BY created_at DESC",
+                    (start_date, end_date)
+                )
+            else:
+                cur.execute(f"SELECT {columns} FROM complaints ORDER BY created_at DESC")
+            rows = complaints_pdf_rows(cur)
+        
+        # Generate PDF once the connection is back in the pool, into a real
+        # temporary file: gunicorn sends it with sendfile(), which needs a fileno
+        pdf_file = tempfile.TemporaryFile()
+        try:
+            generate_complaints_pdf(rows, period_text, pdf_file)
+        except Exception:
+            pdf_file.close()
+            raise
+        
+        # send_file streams the file in blocks and closes it when done
+        pdf_size = pdf_file.tell()
+        pdf_file.seek(0)
         filename = f"complaints_report_{period}_{today}.pdf"
-        return send_file(
-            pdf_buffer,
+        response = send_file(
+            pdf_file,
             as_attachment=True,
             download_name=filename,
             mimetype='application/pdf'
         )
+        response.content_length = pdf_size
+        return response
         
-    except Exception as e:
-        print(f"Error generating PDF: {e}")
+    except Exception:
+        app.logger.exception("Error generating PDF")
         flash('Error generating report', 'error')
         return redirect(url_for('admin_dashboard'))
-    finally:
-        cur.close()
-        conn.close()
 
 @app.route('/admin/update-status/<int:complaint_id>', methods=['POST'])
+@admin_required_json
 def update_status(complaint_id):
-    if not session.get('admin_logged_in'):
-        return jsonify({'success': False, 'message': 'Not authorized'}), 401
-    
     new_status = request.json.get('status')
     
     if new_status not in ['pending', 'completed']:
         return jsonify({'success': False, 'message': 'Invalid status'})
     
-    conn = get_db_connection()
-    if conn is None:
-        return jsonify({'success': False, 'message': 'Database connection error'}), 500
-    
-    cur = conn.cursor()
-    
     try:
-        if new_status == 'completed':
-            cur.execute(
-                "UPDATE complaints SET status = %s, completed_at = %s WHERE id = %s",
-                (new_status, datetime.now(sa_timezone), complaint_id)
-            )
-        else:
+        with db_cursor() as cur:
             cur.execute(
-                "UPDATE complaints SET status = %s, completed_at = NULL WHERE id = %s",
-                (new_status, complaint_id)
+                "UPDATE complaints SET status = %s, "
+                "completed_at = CASE WHEN %s = 'completed' THEN now() END, updated_at = now() "
+                "WHERE id = %s RETURNING id",
+                (new_status, new_status, complaint_id)
             )
+            if cur.fetchone() is None:
+                return jsonify({'success': False, 'message': 'Complaint not found'}), 404
         
-        conn.commit()
         return jsonify({'success': True})
     
-    except Exception as e:
-        conn.rollback()
+    except Exception:
+        app.logger.exception("Error updating status")
         return jsonify({'success': False, 'message': 'Error updating status'}), 500
-    finally:
-        cur.close()
-        conn.close()
 
 @app.route('/admin/add-student', methods=['POST'])
+@admin_required_json
 def add_student():
-    if not session.get('admin_logged_in'):
-        return jsonify({'success': False, 'message': 'Not authorized'}), 401
-    
     student_number = request.json.get('student_number')
     name_surname = request.json.get('name_surname')
     
     if not student_number or not name_surname:
         return jsonify({'success': False, 'message': 'Student number and name are required'}), 400
     
-    conn = get_db_connection()
-    if conn is None:
-        return jsonify({'success': False, 'message': 'Database connection error'}), 500
-    
-    cur = conn.cursor()
-    
     try:
-        # Check if student already exists
-        cur.execute("SELECT * FROM students WHERE student_number = %s", (student_number,))
-        existing_student = cur.fetchone()
-        
-        if existing_student:
-            return jsonify({'success': False, 'message': 'Student number already exists'}), 400
-        
-        # Add new student with name_surname
-        cur.execute("INSERT INTO students (student_number, name_surname) VALUES (%s, %s)", (student_number, name_surname))
-        conn.commit()
+        with db_cursor() as cur:
+            # Check if student already exists
+            cur.execute("SELECT 1 FROM students WHERE student_number = %s", (student_number,))
+            existing_student = cur.fetchone()
+            
+            if existing_student:
+                return jsonify({'success': False, 'message': 'Student number already exists'}), 400
+            
+            # Add new student with name_surname
+            cur.execute("INSERT INTO students (student_number, name_surname) VALUES (%s, %s)", (student_number, name_surname))
+        
+        clear_students_cache()
         return jsonify({'success': True, 'message': 'Student added successfully'})
     
-    except Exception as e:
-        conn.rollback()
+    except Exception:
+        app.logger.exception("Error adding student")
         return jsonify({'success': False, 'message': 'Error adding student'}), 500
-    finally:
-        cur.close()
-        conn.close()
 
-@app.route('/admin/delete-student/<int:student_id>', methods=['POST'])
-def delete_student(student_id):
-    if not session.get('admin_logged_in'):
-        return jsonify({'success': False, 'message': 'Not authorized'}), 401
-    
-    conn = get_db_connection()
-    if conn is None:
-        return jsonify({'success': False, 'message': 'Database connection error'}), 500
+def bulk_add_students(rows):
+    """Insert (student_number, name_surname) rows, skipping numbers that already exist"""
+    with db_cursor() as cur:
+        # One multi-row INSERT per 500 students instead of a round-trip per student
+        added = execute_values(
+            cur,
+            "INSERT INTO students (student_number, name_surname) VALUES %s ON CONFLICT (student_number) DO NOTHING RETURNING student_number",
+            rows,
+            page_size=500,
+            fetch=True
+        )
     
-    cur = conn.cursor()
+    clear_students_cache()
+    return [student_number for (student_number,) in added]
+
+def parse_students_csv(text):
+    """Read student_number,name_surname rows from CSV text (header row optional)"""
+    rows = [
+        [cell.strip() for cell in row]
+        for row in csv.reader(io.StringIO(text))
+        if any(cell.strip() for cell in row)
+    ]
+    if rows and [cell.lower() for cell in rows[0][:2]] == ['student_number', 'name_surname']:
+        rows = rows[1:]
+    return [{'student_number': row[0], 'name_surname': row[1] if len(row) > 1 else ''} for row in rows]
+
+@app.route('/admin/add-students-bulk', methods=['POST'])
+@admin_required_json
+def add_students_bulk():
+    # Accepts a JSON list of students, or CSV as an uploaded 'file' or a text/csv body
+    upload = request.files.get('file')
+    if upload or request.mimetype == 'text/csv':
+        data = upload.read() if upload else request.get_data()
+        try:
+            # utf-8-sig drops the byte order mark Excel puts before the header
+            students = parse_students_csv(data.decode('utf-8-sig'))
+        except UnicodeDecodeError:
+            return jsonify({'success': False, 'message': 'CSV file must be UTF-8 encoded'}), 400
+    else:
+        students = request.get_json(silent=True)
+    
+    if not isinstance(students, list) or not students:
+        return jsonify({'success': False, 'message': 'Expected a list of students'}), 400
+    
+    rows = []
+    for student in students:
+        student_number = student.get('student_number') if isinstance(student, dict) else None
+        name_surname = student.get('name_surname') if isinstance(student, dict) else None
+        if not student_number or not name_surname:
+            return jsonify({'success': False, 'message': 'Student number and name are required for every student'}), 400
+        rows.append((student_number, name_surname))
     
     try:
-        # Get student number before deletion for reference
-        cur.execute("SELECT student_number FROM students WHERE id = %s", (student_id,))
-        student_result = cur.fetchone()
-        
-        if not student_result:
-            return jsonify({'success': False, 'message': 'Student not found'}), 404
-        
-        student_number = student_result[0]
-        
-        # Delete only the student (keep their complaints in the database)
-        cur.execute("DELETE FROM students WHERE id = %s", (student_id,))
-        
-        # Removed the line that deletes complaints
-        # cur.execute("DELETE FROM complaints WHERE student_number = %s", (student_number,))
-        
-        conn.commit()
-        return jsonify({'success': True, 'message': 'Student deleted successfully (complaints preserved)'})
-    
-    except Exception as e:
-        conn.rollback()
-        return jsonify({'success': False, 'message': 'Error deleting student'}), 500
-    finally:
-        cur.close()
-        conn.close()
-    if not session.get('admin_logged_in'):
-        return jsonify({'success': False, 'message': 'Not authorized'}), 401
-    
-    conn = get_db_connection()
-    if conn is None:
-        return jsonify({'success': False, 'message': 'Database connection error'}), 500
-    
-    cur = conn.cursor()
+        added = bulk_add_students(rows)
+        return jsonify({
+            'success': True,
+            'message': f'{len(added)} students added, {len(rows) - len(added)} already existed',
+            'added': len(added)
+        })
     
+    except Exception:
+        app.logger.exception("Error adding students")
+        return jsonify({'success': False, 'message': 'Error adding students'}), 500
+
+@app.route('/admin/delete-student/<int:student_id>', methods=['POST'])
+@admin_required_json
+def delete_student(student_id):
     try:
-        # Get student number before deletion for cleanup
-        cur.execute("SELECT student_number FROM students WHERE id = %s", (student_id,))
-        student_result = cur.fetchone()
-        
-        if not student_result:
-            return jsonify({'success': False, 'message': 'Student not found'}), 404
-        
-        student_number = student_result[0]
-        
-        # Delete student (this will now work even if they have complaints)
-        cur.execute("DELETE FROM students WHERE id = %s", (student_id,))
-        
-        # Also delete their complaints (optional - you can remove this line if you want to keep complaints)
-        cur.execute("DELETE FROM complaints WHERE student_number = %s", (student_number,))
-        
-        conn.commit()
-        return jsonify({'success': True, 'message': 'Student and their complaints deleted successfully'})
-    
-    except Exception as e:
-        conn.rollback()
+        with db_cursor() as cur:
+            # Delete only the student (keep their complaints in the database)
+            # and report whether any complaints were left behind
+            cur.execute('''
+                WITH deleted AS (
+                    DELETE FROM students WHERE id = %s RETURNING student_number
+                )
+                SELECT student_number,
+                       EXISTS (SELECT 1 FROM complaints c WHERE c.student_number = deleted.student_number)
+                FROM deleted
+            ''', (student_id,))
+            student_result = cur.fetchone()
+            
+            if not student_result:
+                return jsonify({'success': False, 'message': 'Student not found'}), 404
+        
+        clear_students_cache()
+        has_complaints = student_result[1]
+        if has_complaints:
+            return jsonify({'success': True, 'message': 'Student deleted successfully (complaints preserved)'})
+        return jsonify({'success': True, 'message': 'Student deleted successfully'})
+    
+    except Exception:
+        app.logger.exception("Error deleting student")
         return jsonify({'success': False, 'message': 'Error deleting student'}), 500
-    finally:
-        cur.close()
-        conn.close()
 
 @app.route('/admin/logout')
 def admin_logout():
@@ -578,6 +948,11 @@ def admin_logout():
 def not_found_error(error):
     return render_template('404.html'), 404
 
+@app.errorhandler(429)
+def ratelimit_error(error):
+    flash('Too many login attempts. Please wait a minute and try again.', 'error')
+    return render_template('admin_login.html'), 429
+
 @app.errorhandler(500)
 def internal_error(error):
     return render_template('500.html'), 500
@@ -585,4 +960,8 @@ def internal_error(error):
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
+    try:
+        init_db()
+    except Exception:
+        pass  # Already logged; the dev server still starts
     app.run(host='0.0.0.0', port=port, debug=debug)
\ No newline at end of file
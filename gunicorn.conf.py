@@ -0,0 +1,15 @@
+# Gunicorn settings, picked up automatically from the working directory
+import os
+
+# Threaded workers: requests spend most of their time waiting on Postgres,
+# so one process can overlap many of them. A slow PDF export only ties up
+# its own thread instead of the whole worker.
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+
+# Each busy thread holds one pooled connection, so stay within the
+# ThreadedConnectionPool maximum (20) in app.py
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+
+# Large "all time" PDF reports can take longer than the 30s default
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))